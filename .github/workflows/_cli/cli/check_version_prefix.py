@@ -1,11 +1,61 @@
 # Derived from https://github.com/canonical/data-platform-workflows/blob/v48.0.4/_cli/data_platform_workflows_cli/check_semantic_version_prefix.py
+import enum
+import functools
 import os
-import re
 
 
-def check(message: str, /, *, message_type="commit message") -> str:
+class Prefix(enum.IntFlag):
+    """Version prefix
+
+    Higher value is higher priority. Prefixes from multiple commits can be combined with `|`
+    """
+
+    PATCH = 1
+    COMPATIBLE = 2
+    BREAKING = 4
+    REFRESH_BREAKING = 8
+
+
+# Ordered by expected frequency
+_VALID_PREFIXES = {
+    "patch": Prefix.PATCH,
+    "compatible": Prefix.COMPATIBLE,
+    "breaking": Prefix.BREAKING,
+    "REFRESH BREAKING": Prefix.REFRESH_BREAKING,
+}
+
+
+# Release windows often contain duplicate commit subjects
+@functools.lru_cache(maxsize=4096)
+def _parse_prefix(message: str, /) -> Prefix | None:
+    """Return valid version prefix that message begins with, or `None` if there is no valid prefix
+
+    Equivalent to matching `(?P<prefix>[^():]+)(?:\\([^():]+\\))?:` and checking that `prefix` is
+    valid—without the regex engine
+    """
+    for prefix_text, prefix in _VALID_PREFIXES.items():
+        if not message.startswith(prefix_text):
+            continue
+        # No valid prefix begins with another valid prefix; if this prefix does not match, no
+        # other prefix will
+        rest = message[len(prefix_text) :]
+        if rest.startswith(":"):
+            return prefix
+        if rest.startswith("("):
+            # Optional scope in parentheses
+            end = rest.find(")")
+            scope = rest[1:end]
+            if end > 1 and "(" not in scope and ":" not in scope and rest[end + 1 : end + 2] == ":":
+                return prefix
+        return None
+    return None
+
+
+def check(message: str, /, *, message_type="commit message") -> Prefix:
     """Check that message begins with valid version prefix and return prefix"""
-    error_message = f"""{message_type[0].upper() + message_type[1:]} must contain prefix to increment version
+    prefix = _parse_prefix(message)
+    if prefix is None:
+        error_message = f"""{message_type[0].upper() + message_type[1:]} must contain prefix to increment version
 
 See https://github.com/canonical/charm-refresh?tab=readme-ov-file#versioning
 
@@ -14,11 +64,6 @@ Inside the parentheses, these characters are not allowed: `():`
 
 Got invalid {message_type}: {repr(message)}
 """
-    match = re.match(r"(?P<prefix>[^():]+)(?:\([^():]+\))?:", message)
-    if not match:
-        raise ValueError(error_message)
-    prefix = match.group("prefix")
-    if prefix not in ("REFRESH BREAKING", "breaking", "compatible", "patch"):
         raise ValueError(error_message)
     return prefix
 
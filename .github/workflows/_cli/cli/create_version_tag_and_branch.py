@@ -1,9 +1,9 @@
 # Derived from https://github.com/canonical/data-platform-workflows/blob/v48.0.4/_cli/data_platform_workflows_cli/create_semantic_version_tag.py
 import argparse
+import contextlib
 import dataclasses
 import logging
 import os
-import re
 import subprocess
 import sys
 
@@ -12,6 +12,104 @@ from . import check_version_prefix
 logging.basicConfig(level=logging.INFO, stream=sys.stdout)
 
 
+# Index of `Version` field incremented for highest priority prefix
+# (Fields after incremented field are reset to 0)
+_INCREMENTED_FIELD = {
+    check_version_prefix.Prefix.REFRESH_BREAKING: 0,
+    check_version_prefix.Prefix.BREAKING: 1,
+    check_version_prefix.Prefix.COMPATIBLE: 2,
+    check_version_prefix.Prefix.PATCH: 3,
+}
+
+# Environment for read-only `git` commands (prepared once)
+# `LC_ALL=C` skips locale initialization and `GIT_OPTIONAL_LOCKS=0` skips optional locks (e.g.
+# index refresh)
+_READ_ONLY_GIT_ENV = {**os.environ, "GIT_OPTIONAL_LOCKS": "0", "LC_ALL": "C"}
+
+
+def _git(*args: str, input: str | None = None) -> str:
+    """Run read-only `git` command and return stdout
+
+    Raises:
+        subprocess.CalledProcessError: `git` exited with non-zero exit code (stderr is captured)
+    """
+    return subprocess.check_output(
+        ["git", *args], input=input, stderr=subprocess.PIPE, text=True, env=_READ_ONLY_GIT_ENV
+    )
+
+
+def _log(revision_range: str, /):
+    """Yield commit hash & subject for each commit in revision range (newest commit first)
+
+    Streams `git log` output (with each commit terminated by NUL) so that commits are processed
+    while `git log` is running. If the generator is closed early, `git log` is stopped
+    """
+    with subprocess.Popen(
+        ["git", "log", revision_range, "-z", "--pretty=tformat:%H %s"],
+        stdout=subprocess.PIPE,
+        text=True,
+        env=_READ_ONLY_GIT_ENV,
+    ) as process:
+        try:
+            remainder = ""
+            for chunk in iter(lambda: process.stdout.read(65536), ""):
+                *commits, remainder = (remainder + chunk).split("\0")
+                for commit in commits:
+                    sha, _, subject = commit.partition(" ")
+                    yield sha, subject
+        except GeneratorExit:
+            process.kill()
+            raise
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, process.args)
+    assert remainder == ""
+
+
+def _resolve_commits(*revisions: str) -> dict[str, str | None]:
+    """Resolve revisions to commit hashes with a single `git` process
+
+    Value is `None` if revision does not exist
+    """
+    output = _git(
+        "cat-file",
+        "--batch-check=%(objectname)",
+        input="".join(f"{revision}^{{commit}}\n" for revision in revisions),
+    ).splitlines()
+    assert len(output) == len(revisions)
+    # Example missing revision: "v1.0.0.1^{commit} missing"
+    return {
+        revision: None if line.endswith(" missing") else line
+        for revision, line in zip(revisions, output)
+    }
+
+
+@dataclasses.dataclass(frozen=True)
+class Version:
+    refresh: int
+    major: int
+    minor: int
+    patch: int
+
+    @classmethod
+    def from_tag(cls, tag: str, /):
+        # Equivalent to regular expression derived from
+        # https://semver.org/#is-there-a-suggested-regular-expression-regex-to-check-a-semver-string
+        # `v(0|[1-9]\d*)\.(0|[1-9]\d*)\.(0|[1-9]\d*)\.(0|[1-9]\d*)`
+        if not tag.startswith("v"):
+            raise ValueError
+        parts = tag[1:].split(".")
+        if len(parts) != 4:
+            raise ValueError
+        for part in parts:
+            # Reject empty parts and leading zeros (e.g. "01")
+            if not (part.isascii() and part.isdecimal()) or (part != "0" and part.startswith("0")):
+                raise ValueError
+        return cls(*(int(part) for part in parts))
+
+    def to_tag(self) -> str:
+        return f"v{self.refresh}.{self.major}.{self.minor}.{self.patch}"
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--branch-name", required=True)
@@ -20,55 +118,36 @@ def main():
 
     # Get last release tag
     try:
-        last_tag = subprocess.run(
+        last_tag = _git(
             # Include "." in match so that we don't match major version tags (e.g. "v1") commonly
             # used in GitHub Actions
             # Use `HEAD^` to exclude a tag created by a previous workflow run (on `HEAD`) if the
             # workflow was retried
-            ["git", "describe", "--abbrev=0", "--match", "v[0-9]*.*", "HEAD^"],
-            capture_output=True,
-            check=True,
-            text=True,
-        ).stdout.strip()
+            "describe",
+            "--abbrev=0",
+            "--match",
+            "v[0-9]*.*",
+            "HEAD^",
+        ).strip()
     except subprocess.CalledProcessError as e:
         print(f"{e.stderr=}")
         raise
     logging.info(f"Last release tag: {last_tag}")
 
     # Get commit prefixes since last release tag
-    commit_subjects = subprocess.run(
-        ["git", "log", f"{last_tag}..HEAD", "--pretty=format:%s"],
-        capture_output=True,
-        check=True,
-        text=True,
-    ).stdout.splitlines()
-    assert len(commit_subjects) > 0
-    prefixes = set()
-    for subject in commit_subjects:
-        prefixes.add(check_version_prefix.check(subject))
-    logging.info(f"Commit prefixes since last release tag: {prefixes}")
-
-    @dataclasses.dataclass(frozen=True)
-    class Version:
-        refresh: int
-        major: int
-        minor: int
-        patch: int
-
-        @classmethod
-        def from_tag(cls, tag: str, /):
-            # Regular expression derived from
-            # https://semver.org/#is-there-a-suggested-regular-expression-regex-to-check-a-semver-string
-            match = re.fullmatch(
-                r"v(?P<refresh>0|[1-9]\d*)\.(?P<major>0|[1-9]\d*)\.(?P<minor>0|[1-9]\d*)\.(?P<patch>0|[1-9]\d*)",
-                tag,
-            )
-            if not match:
-                raise ValueError
-            return cls(**{name: int(value) for name, value in match.groupdict().items()})
-
-        def to_tag(self) -> str:
-            return f"v{self.refresh}.{self.major}.{self.minor}.{self.patch}"
+    head_commit_sha = None
+    prefixes = check_version_prefix.Prefix(0)
+    with contextlib.closing(_log(f"{last_tag}..HEAD")) as commits:
+        for sha, subject in commits:
+            if head_commit_sha is None:
+                # `git log` output starts with `HEAD`
+                head_commit_sha = sha
+            prefixes |= check_version_prefix.check(subject)
+            if prefixes & check_version_prefix.Prefix.REFRESH_BREAKING:
+                # Highest priority prefix; other commits cannot change the new version
+                break
+    assert head_commit_sha is not None
+    logging.info(f"Commit prefixes since last release tag: {repr(prefixes)}")
 
     try:
         last_version = Version.from_tag(last_tag)
@@ -77,22 +156,16 @@ def main():
 
     # Determine new version based on commit prefixes
     assert last_version.refresh > 0
-    if "REFRESH BREAKING" in prefixes:
-        new_version = Version(last_version.refresh + 1, 0, 0, 0)
-        create_branch_for_last_version = True
-    elif "breaking" in prefixes:
-        new_version = Version(last_version.refresh, last_version.major + 1, 0, 0)
-        create_branch_for_last_version = True
-    elif "compatible" in prefixes:
-        new_version = Version(last_version.refresh, last_version.major, last_version.minor + 1, 0)
-        create_branch_for_last_version = True
-    elif "patch" in prefixes:
-        new_version = Version(
-            last_version.refresh, last_version.major, last_version.minor, last_version.patch + 1
-        )
-        create_branch_for_last_version = False
-    else:
-        raise ValueError
+    # Highest priority prefix
+    prefix = check_version_prefix.Prefix(1 << (prefixes.bit_length() - 1))
+    fields = dataclasses.astuple(last_version)
+    incremented_field = _INCREMENTED_FIELD[prefix]
+    new_version = Version(
+        *fields[:incremented_field],
+        fields[incremented_field] + 1,
+        *(0 for _ in fields[incremented_field + 1 :]),
+    )
+    create_branch_for_last_version = prefix is not check_version_prefix.Prefix.PATCH
     new_tag = new_version.to_tag()
     logging.info(f"Determined new release tag: {new_tag}")
 
@@ -102,26 +175,40 @@ def main():
             f"{prefixes=} {branch_name=}"
         )
 
-    subprocess.run(["git", "config", "user.name", "GitHub Actions"], check=True)
-    subprocess.run(
-        ["git", "config", "user.email", "41898282+github-actions[bot]@users.noreply.github.com"],
-        check=True,
-    )
+    if create_branch_for_last_version:
+        branch_for_last_version = (
+            f"{last_version.refresh}.{last_version.major}.{last_version.minor}"
+        )
+        commit_shas = _resolve_commits(new_tag, f"origin/{branch_for_last_version}", last_tag)
+    else:
+        commit_shas = _resolve_commits(new_tag)
+
+    # Local ref updates (in `git update-ref --stdin` format) and refspecs to push
+    # Collected so that all updates are written with one `git` process and pushed with one `git
+    # push`
+    ref_updates = []
+    refspecs = []
 
     logging.info("Checking if new release tag already exists")
-    try:
-        tag_commit_sha = subprocess.run(
-            ["git", "rev-list", "-n", "1", new_tag], capture_output=True, check=True, text=True
-        ).stdout.strip()
-    except subprocess.CalledProcessError:
+    tag_commit_sha = commit_shas[new_tag]
+    if tag_commit_sha is None:
         logging.info("Release tag does not already exist. Creating tag")
+        # Only needed for annotated tag (lightweight tags & branches do not have an author)
+        subprocess.run(["git", "config", "user.name", "GitHub Actions"], check=True)
+        subprocess.run(
+            [
+                "git",
+                "config",
+                "user.email",
+                "41898282+github-actions[bot]@users.noreply.github.com",
+            ],
+            check=True,
+        )
+        # Annotated tag object cannot be created with `git update-ref`
         subprocess.run(["git", "tag", new_tag, "--annotate", "-m", new_tag], check=True)
-        subprocess.run(["git", "push", "origin", new_tag], check=True)
+        refspecs.append(f"refs/tags/{new_tag}")
     else:
         logging.info("Release tag already exists. Verifying tag")
-        head_commit_sha = subprocess.run(
-            ["git", "rev-parse", "HEAD"], capture_output=True, check=True, text=True
-        ).stdout.strip()
         if head_commit_sha == tag_commit_sha:
             logging.info("Verified existing tag points to the correct commit")
         else:
@@ -131,52 +218,41 @@ def main():
             )
 
     if branch_name == "main":
-        # Update antora-main- tag before pushing branch for previous minor version to avoid race
-        # condition if documentation build triggered
+        # Update antora-main- tag in the same (atomic) push as the branch for previous minor
+        # version to avoid race condition if documentation build triggered
         # (Otherwise, there would be documentation sources with duplicate versions, which would
         # cause the Antora build to fail)
         logging.info("Updating antora-main- tag")
-        tags_to_delete = subprocess.run(
-            ["git", "tag", "--list", "antora-main-*"],
-            capture_output=True,
-            check=True,
-            text=True,
-        ).stdout.splitlines()
-        for tag in tags_to_delete:
-            subprocess.run(["git", "push", "--delete", "origin", tag], check=True)
-            subprocess.run(["git", "tag", "--delete", tag], check=True)
         antora_main_tag = (
             f"antora-main-{new_version.refresh}.{new_version.major}.{new_version.minor}"
         )
-        subprocess.run(["git", "tag", antora_main_tag, new_tag], check=True)
-        subprocess.run(["git", "push", "origin", antora_main_tag], check=True)
+        tags_to_delete = _git("tag", "--list", "antora-main-*").splitlines()
+        for tag in tags_to_delete:
+            if tag != antora_main_tag:
+                ref_updates.append(f"delete refs/tags/{tag}")
+                refspecs.append(f":refs/tags/{tag}")
+        ref_updates.append(f"update refs/tags/{antora_main_tag} refs/tags/{new_tag}")
+        # Force push since tag may already exist on a different commit
+        refspecs.append(f"+refs/tags/{antora_main_tag}")
 
     if create_branch_for_last_version:
-        branch_for_last_version = (
-            f"{last_version.refresh}.{last_version.major}.{last_version.minor}"
-        )
         logging.info(
             f"Checking if branch for previous minor version ({repr(branch_for_last_version)}) "
             "already exists"
         )
-        try:
-            branch_commit_sha = subprocess.run(
-                ["git", "rev-list", "-n", "1", f"origin/{branch_for_last_version}"],
-                capture_output=True,
-                check=True,
-                text=True,
-            ).stdout.strip()
-        except subprocess.CalledProcessError:
+        branch_commit_sha = commit_shas[f"origin/{branch_for_last_version}"]
+        if branch_commit_sha is None:
             logging.info(
                 f"{repr(branch_for_last_version)} branch does not already exist. Creating branch"
             )
-            subprocess.run(["git", "branch", branch_for_last_version, last_tag], check=True)
-            subprocess.run(["git", "push", "origin", branch_for_last_version], check=True)
+            ref_updates.append(
+                f"create refs/heads/{branch_for_last_version} refs/tags/{last_tag}^{{commit}}"
+            )
+            refspecs.append(f"refs/heads/{branch_for_last_version}")
         else:
             logging.info(f"{repr(branch_for_last_version)} branch already exists. Verifying branch")
-            last_tag_commit_sha = subprocess.run(
-                ["git", "rev-list", "-n", "1", last_tag], capture_output=True, check=True, text=True
-            ).stdout.strip()
+            last_tag_commit_sha = commit_shas[last_tag]
+            assert last_tag_commit_sha is not None
             if last_tag_commit_sha == branch_commit_sha:
                 logging.info("Verified existing branch points to the correct commit")
             else:
@@ -185,7 +261,22 @@ def main():
                     f"{last_tag_commit_sha} but tag already exists on commit {branch_commit_sha}"
                 )
 
+    if ref_updates:
+        subprocess.run(
+            ["git", "update-ref", "--stdin"],
+            input="".join(f"{update}\n" for update in ref_updates),
+            check=True,
+            text=True,
+        )
+    if refspecs:
+        subprocess.run(["git", "push", "--atomic", "origin", *refspecs], check=True)
+
     output = f"tag={new_tag}"
     print(f"\n\n{output}")
-    with open(os.environ["GITHUB_OUTPUT"], "a") as file:
-        file.write(output)
+    # Single `write()` syscall so that output is not interleaved with other writers
+    # GitHub Actions outputs are newline-delimited
+    file = os.open(os.environ["GITHUB_OUTPUT"], os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+    try:
+        os.write(file, f"{output}\n".encode())
+    finally:
+        os.close(file)
@@ -14,17 +14,20 @@ import typing
 
 import charm_ as charm
 import charm_json
-import httpx
-import lightkube
-import lightkube.models.authorization_v1
-import lightkube.resources.apps_v1
-import lightkube.resources.authorization_v1
-import lightkube.resources.core_v1
 import ops
-import packaging.version
 import tomli
 import yaml
 
+if typing.TYPE_CHECKING:
+    import lightkube
+    import lightkube.resources.core_v1
+    import packaging.version
+
+# Juju runs the charm in a new process for each event
+# To reduce import time, dependencies that are only needed on Kubernetes (`lightkube`), on machines
+# (`httpx`), or for development builds (`packaging`) are imported where used
+# (`yaml` is imported at module level since `ops` already imports it)
+
 # Use package name instead of module name
 logger = logging.getLogger(__name__.rsplit(".", maxsplit=1)[0])
 
@@ -36,7 +39,33 @@ def _removeprefix(text: str, /, *, prefix: str) -> str:
     return text
 
 
-@functools.total_ordering
+@functools.lru_cache(maxsize=256)
+def _parse_pep440_version(version: str, /) -> "packaging.version.Version":
+    """Cached `packaging.version.Version` construction
+
+    `packaging.version.Version` is immutable
+    """
+    import packaging.version
+
+    return packaging.version.Version(version)
+
+
+def _parse_released_version(version: str, /) -> typing.Optional[typing.Tuple[int, int, int]]:
+    """Parse released PEP 440 version (e.g. "1.19.0") without `packaging`
+
+    Returns `None` if version is not 3 number components in normalized form (e.g. development
+    build, leading zero)—those versions are parsed with `packaging`
+    """
+    parts = version.split(".")
+    if len(parts) != 3:
+        return None
+    for part in parts:
+        if not (part.isascii() and part.isdecimal()) or (part != "0" and part.startswith("0")):
+            return None
+    major, minor, patch = parts
+    return int(major), int(minor), int(patch)
+
+
 class CharmVersion:
     """Charm code version
 
@@ -45,7 +74,25 @@ class CharmVersion:
     TODO: link to docs about versioning spec
     """
 
+    __slots__ = ("_version", "track", "_pep440_version", "released", "major", "_release", "_hash")
+
+    _instances: typing.Dict[str, "CharmVersion"] = {}
+    """Parsed instances by version string
+
+    Charm versions are drawn from a small set (this unit's version & versions reported by other
+    units), so each version string is parsed once and the instance is reused
+    """
+
+    def __new__(cls, version: str, /):
+        instance = cls._instances.get(version)
+        if instance is not None and type(instance) is cls:
+            return instance
+        return super().__new__(cls)
+
     def __init__(self, version: str, /):
+        if getattr(self, "_version", None) is not None:
+            # Already parsed (instance returned by `__new__` from `_instances`)
+            return
         # Example 1: "16/1.19.0"
         # Example 2: "16/1.19.0.post1.dev0+71201f4.dirty"
         self._version = version
@@ -59,27 +106,41 @@ class CharmVersion:
                 f"Invalid charm version {repr(str(self))}. PEP 440 epoch ('!' character) not "
                 "supported"
             )
-        try:
-            self._pep440_version = packaging.version.Version(pep440_version)
-        except packaging.version.InvalidVersion:
-            raise ValueError(f"Invalid charm version {repr(str(self))}")
-        if len(self._pep440_version.release) != 3:
-            raise ValueError(
-                f"Invalid charm version {repr(str(self))}. Expected 3 number components after "
-                f"track; got {len(self._pep440_version.release)} components: "
-                f"{repr(self._pep440_version.base_version)}"
-            )
+        release = _parse_released_version(pep440_version)
+        if release is not None:
+            # Common case (released version); skip `packaging`
+            # Parsed with `packaging` only if compared to a development build with the same release
+            # (e.g. "16/1.19.0.post1.dev0+71201f4.dirty")
+            self._pep440_version = None
+            released = True
+        else:
+            import packaging.version
+
+            try:
+                self._pep440_version = _parse_pep440_version(pep440_version)
+            except packaging.version.InvalidVersion:
+                raise ValueError(f"Invalid charm version {repr(str(self))}")
+            release = self._pep440_version.release
+            if len(release) != 3:
+                raise ValueError(
+                    f"Invalid charm version {repr(str(self))}. Expected 3 number components after "
+                    f"track; got {len(release)} components: "
+                    f"{repr(self._pep440_version.base_version)}"
+                )
+            released = pep440_version == self._pep440_version.base_version
         # Example 1: True
         # Example 2: False
-        self.released = pep440_version == self._pep440_version.base_version
+        self.released = released
         """Whether version was released & correctly tagged
 
         `True` for charm code correctly released to Charmhub
         `False` for development builds
         """
 
+        # Example 1: (1, 19, 0)
+        self._release: typing.Tuple[int, int, int] = tuple(release)
         # Example 1: 1
-        self.major = self._pep440_version.release[0]
+        self.major = release[0]
         """Incremented if refresh not supported or only supported with intermediate charm version
 
         If a change is made to the charm code that causes refreshes to not be supported or to only
@@ -90,6 +151,10 @@ class CharmVersion:
         charm version.
         """
         # TODO: add info about intermediate charms & link to docs about versioning spec
+        # Consistent with `__eq__` (equal to `str`)
+        self._hash = hash(self._version)
+        # Only cache instance after version is validated
+        self._instances[version] = self
 
     def __str__(self):
         return self._version
@@ -102,15 +167,62 @@ class CharmVersion:
             return str(self) == other
         return isinstance(other, CharmVersion) and self._version == other._version
 
-    def __gt__(self, other):
+    def __hash__(self):
+        return self._hash
+
+    def _get_pep440_version(self) -> "packaging.version.Version":
+        if self._pep440_version is None:
+            self._pep440_version = _parse_pep440_version(
+                _removeprefix(self._version, prefix=f"{self.track}/")
+            )
+        return self._pep440_version
+
+    def _comparison_keys(self, other, /):
+        """Keys to compare `self` and `other`
+
+        Returns `None` if `other` is not a `CharmVersion`
+
+        Raises:
+            ValueError: `other` has a different track
+        """
         if not isinstance(other, CharmVersion):
-            return NotImplemented
+            return None
         if self.track != other.track:
             raise ValueError(
                 f"Unable to compare versions with different tracks: {repr(self.track)} and "
                 f"{repr(other.track)} ({repr(self)} and {repr(other)})"
             )
-        return self._pep440_version > other._pep440_version
+        # PEP 440 versions are ordered by release (e.g. (1, 19, 0)) before pre, post, dev, or local
+        # segments (& epoch is not supported)
+        if self._release != other._release or (self.released and other.released):
+            return self._release, other._release
+        return self._get_pep440_version(), other._get_pep440_version()
+
+    # Comparison operators are defined explicitly (instead of with `functools.total_ordering`) so
+    # that each comparison is a single method call
+    def __lt__(self, other):
+        keys = self._comparison_keys(other)
+        if keys is None:
+            return NotImplemented
+        return keys[0] < keys[1]
+
+    def __le__(self, other):
+        keys = self._comparison_keys(other)
+        if keys is None:
+            return NotImplemented
+        return keys[0] <= keys[1]
+
+    def __gt__(self, other):
+        keys = self._comparison_keys(other)
+        if keys is None:
+            return NotImplemented
+        return keys[0] > keys[1]
+
+    def __ge__(self, other):
+        keys = self._comparison_keys(other)
+        if keys is None:
+            return NotImplemented
+        return keys[0] >= keys[1]
 
 
 class PrecheckFailed(Exception):
@@ -329,24 +441,29 @@ class KubernetesJujuAppNotTrusted(Exception):
     """
 
 
+_OPS_STATUS_TYPES = {
+    charm.ActiveStatus: ops.ActiveStatus,
+    charm.WaitingStatus: ops.WaitingStatus,
+    charm.MaintenanceStatus: ops.MaintenanceStatus,
+    charm.BlockedStatus: ops.BlockedStatus,
+}
+
+
 def _convert_to_ops_status(
     status: typing.Optional[charm.Status],
 ) -> typing.Optional[ops.StatusBase]:
     if status is None:
         return None
-    ops_types = {
-        charm.ActiveStatus: ops.ActiveStatus,
-        charm.WaitingStatus: ops.WaitingStatus,
-        charm.MaintenanceStatus: ops.MaintenanceStatus,
-        charm.BlockedStatus: ops.BlockedStatus,
-    }
-    for charm_type, ops_type in ops_types.items():
+    ops_type = _OPS_STATUS_TYPES.get(type(status))
+    if ops_type is not None:
+        return ops_type(str(status))
+    # Subclass of charm status type
+    for charm_type, ops_type in _OPS_STATUS_TYPES.items():
         if isinstance(status, charm_type):
             return ops_type(str(status))
     raise ValueError(f"Unknown type {repr(type(status).__name__)}: {repr(status)}")
 
 
-@functools.total_ordering
 class _PauseAfter(str, enum.Enum):
     """`pause-after-unit-refresh` config option"""
 
@@ -359,20 +476,61 @@ class _PauseAfter(str, enum.Enum):
     def _missing_(cls, value):
         return cls.UNKNOWN
 
-    def __gt__(self, other):
+    def _priorities(self, other, /) -> typing.Tuple[int, int]:
         if not isinstance(other, _PauseAfter):
             # Raise instead of `return NotImplemented` since this class inherits from `str`
             raise TypeError
-        priorities = {self.NONE: 0, self.FIRST: 1, self.ALL: 2, self.UNKNOWN: 3}
-        return priorities[self] > priorities[other]
+        return _PAUSE_AFTER_PRIORITIES[self], _PAUSE_AFTER_PRIORITIES[other]
+
+    # All ordering operators are defined since `functools.total_ordering` would not override the
+    # operators inherited from `str`
+    # (`__eq__` & `__hash__` are inherited from `str`)
+    def __lt__(self, other):
+        priority, other_priority = self._priorities(other)
+        return priority < other_priority
+
+    def __le__(self, other):
+        priority, other_priority = self._priorities(other)
+        return priority <= other_priority
+
+    def __gt__(self, other):
+        priority, other_priority = self._priorities(other)
+        return priority > other_priority
+
+    def __ge__(self, other):
+        priority, other_priority = self._priorities(other)
+        return priority >= other_priority
+
+
+_PAUSE_AFTER_PRIORITIES = {
+    _PauseAfter.NONE: 0,
+    _PauseAfter.FIRST: 1,
+    _PauseAfter.ALL: 2,
+    _PauseAfter.UNKNOWN: 3,
+}
+
+
+def _load_refresh_versions_toml() -> typing.Dict[str, typing.Any]:
+    """Parsed refresh_versions.toml"""
+    with pathlib.Path("refresh_versions.toml").open("rb") as file:
+        return tomli.load(file)
+
+
+def _load_metadata_yaml() -> typing.Dict[str, typing.Any]:
+    """Parsed metadata.yaml"""
+    # Use libyaml (C) loader if PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with pathlib.Path("metadata.yaml").open("rb") as file:
+        return yaml.load(file, Loader=loader)
 
 
 class _RefreshVersions:
     """Versions pinned in this unit's refresh_versions.toml"""
 
+    __slots__ = ("_versions", "charm", "workload")
+
     def __init__(self):
-        with pathlib.Path("refresh_versions.toml").open("rb") as file:
-            self._versions = tomli.load(file)
+        self._versions = _load_refresh_versions_toml()
         try:
             self.charm = CharmVersion(self._versions["charm"])
             self.workload: str = self._versions["workload"]
@@ -392,6 +550,8 @@ class _MachinesRefreshVersions(_RefreshVersions):
     `_MachinesRefreshVersions.snap_revision`) may be different from the installed workload versions
     """
 
+    __slots__ = ("snap_name", "snap_revision")
+
     def __init__(self):
         super().__init__()
         try:
@@ -419,6 +579,25 @@ def snap_name() -> str:
     return _MachinesRefreshVersions().snap_name
 
 
+def _read_small_file(path: os.PathLike, /) -> str:
+    """Read small text file (e.g. local state)
+
+    Uses `os.read()` directly instead of the buffered text I/O stack used by
+    `pathlib.Path.read_text()`
+
+    Raises:
+        FileNotFoundError: File does not exist
+    """
+    file = os.open(path, os.O_RDONLY)
+    try:
+        chunks = []
+        while chunk := os.read(file, 4096):
+            chunks.append(chunk)
+    finally:
+        os.close(file)
+    return b"".join(chunks).decode()
+
+
 _LOCAL_STATE = pathlib.Path(".charm_refresh_v3")
 """Local state for this unit
 
@@ -431,16 +610,24 @@ This means that it will not be deleted on container restart—it will only be de
 deleted
 """
 
+_LOCAL_STATE_JSON_ENCODER = json.JSONEncoder(indent=4)
+"""Encoder for JSON files in `_LOCAL_STATE`
+
+Created once instead of on each `json.dumps(..., indent=4)` call
+"""
+
 _dot_juju_charm = pathlib.Path(".juju-charm")
 
 
 class _RawCharmRevision(str):
     """Charm revision in .juju-charm file (e.g. "ch:amd64/jammy/postgresql-k8s-602")"""
 
+    __slots__ = ()
+
     @classmethod
     def from_file(cls):
         """Charm revision in this unit's .juju-charm file"""
-        return cls(_dot_juju_charm.read_text().strip())
+        return cls(_read_small_file(_dot_juju_charm).strip())
 
     @property
     def charmhub_revision(self) -> typing.Optional[str]:
@@ -448,6 +635,18 @@ class _RawCharmRevision(str):
             return self.split("-")[-1]
 
 
+def _charm_version_for_log(version: CharmVersion, revision: _RawCharmRevision, /) -> str:
+    """Charm version for log messages
+
+    Example: "revision 602 (CharmVersion('16/1.19.0'))"
+
+    Falls back to charm version if Charmhub revision is not available
+    """
+    if revision.charmhub_revision:
+        return f"revision {revision.charmhub_revision} ({repr(version)})"
+    return repr(version)
+
+
 def _dot_juju_charm_modified_time():
     """Modified time of .juju-charm file (e.g. 1727768259.4063382)"""
     return _dot_juju_charm.stat().st_mtime
@@ -461,6 +660,15 @@ class _OriginalVersions:
     installation
     """
 
+    # `dataclasses.dataclass(slots=True)` requires python 3.10
+    __slots__ = (
+        "workload",
+        "workload_container",
+        "installed_workload_container_matched_pinned_container",
+        "charm",
+        "charm_revision_raw",
+    )
+
     workload: typing.Optional[str]
     """Original upstream workload version (e.g. "16.8")
 
@@ -522,18 +730,18 @@ class _OriginalVersions:
             "original_charm_version": str(self.charm),
             "original_charm_revision": self.charm_revision_raw,
         }
-        for key, value in new_values.items():
-            if databag.get(key) != value:
-                diff = True
-                break
-        else:
-            diff = False
-        databag.update(new_values)
-        if diff:
+        # Only write changed values—each write is a separate `relation-set` call
+        changed_values = {
+            key: value for key, value in new_values.items() if databag.get(key) != value
+        }
+        databag.update(changed_values)
+        if changed_values:
             logger.info(f"Saved versions to app databag for next refresh: {repr(self)}")
 
 
 class _KubernetesUnit(charm.Unit):
+    __slots__ = ("controller_revision", "pod_uid")
+
     def __new__(cls, name: str, /, *, controller_revision: str, pod_uid: str):
         instance: _KubernetesUnit = super().__new__(cls, name)
         instance.controller_revision = controller_revision
@@ -547,7 +755,7 @@ class _KubernetesUnit(charm.Unit):
         )
 
     @classmethod
-    def from_pod(cls, pod: lightkube.resources.core_v1.Pod, /):
+    def from_pod(cls, pod: "lightkube.resources.core_v1.Pod", /):
         # Example: "postgresql-k8s-0"
         pod_name = pod.metadata.name
         app_name, unit_number = pod_name.rsplit("-", maxsplit=1)
@@ -560,6 +768,50 @@ class _KubernetesUnit(charm.Unit):
         )
 
 
+class _InvalidForceEvent(ValueError):
+    """Event is not valid force-refresh-start action event"""
+
+
+class _KubernetesForceRefreshStartAction(charm.ActionEvent):
+    def __init__(
+        self, event: charm.Event, /, *, first_unit_to_refresh: charm.Unit, in_progress: bool
+    ):
+        if not isinstance(event, charm.ActionEvent):
+            raise _InvalidForceEvent
+        super().__init__()
+        if event.action != "force-refresh-start":
+            raise _InvalidForceEvent
+        if charm.unit != first_unit_to_refresh:
+            event.fail(f"Must run action on unit {first_unit_to_refresh.number}")
+            raise _InvalidForceEvent
+        if not in_progress:
+            event.fail("No refresh in progress")
+            raise _InvalidForceEvent
+        self.check_workload_container: bool = event.parameters["check-workload-container"]
+        self.check_compatibility: bool = event.parameters["check-compatibility"]
+        self.run_pre_refresh_checks: bool = event.parameters["run-pre-refresh-checks"]
+        if (
+            self.check_workload_container
+            and self.check_compatibility
+            and self.run_pre_refresh_checks
+        ):
+            event.fail(
+                "Must run with at least one of `check-compatibility`, "
+                "`run-pre-refresh-checks`, or `check-workload-container` parameters "
+                "`=false`"
+            )
+            raise _InvalidForceEvent
+
+
+class _ResumeRefreshAction(charm.ActionEvent):
+    def __init__(self, event: charm.ActionEvent, /):
+        super().__init__()
+        assert event.action == "resume-refresh"
+        self.check_health_of_refreshed_units: bool = event.parameters[
+            "check-health-of-refreshed-units"
+        ]
+
+
 class Kubernetes(Common):
     """In-place rolling refreshes of stateful charmed applications on Kubernetes
 
@@ -618,22 +870,16 @@ class Kubernetes(Common):
 
     @Common.workload_allowed_to_start.getter
     def workload_allowed_to_start(self) -> bool:
+        if self._workload_allowed_to_start is None:
+            self._workload_allowed_to_start = self._get_workload_allowed_to_start()
+        return self._workload_allowed_to_start
+
+    def _get_workload_allowed_to_start(self) -> bool:
         if not self._in_progress:
             return True
-        for unit in self._units:
-            if (
-                self._unit_controller_revision
-                # During scale up or scale down, `unit` may be missing from relation
-                in self._relation.get(unit, {}).get(
-                    "refresh_started_if_app_controller_revision_hash_in", tuple()
-                )
-            ):
-                return True
-        if self._unit_controller_revision in self._relation.my_app_ro.get(
-            "refresh_started_if_app_controller_revision_hash_in", tuple()
-        ):
+        if self._refresh_started_if_app_controller_revision_hash_in(self._unit_controller_revision):
             return True
-        original_versions = _OriginalVersions.from_app_databag(self._relation.my_app_ro)
+        original_versions = self._original_versions
         if (
             original_versions.charm == self._installed_charm_version
             and original_versions.workload_container == self._installed_workload_container_version
@@ -656,6 +902,17 @@ class Kubernetes(Common):
     ) -> typing.Optional[ops.StatusBase]:
         if not self._in_progress:
             return None
+        message = self._unit_status_lower_priority_messages.get(workload_is_running)
+        if message is None:
+            message = self._get_unit_status_lower_priority_message(
+                workload_is_running=workload_is_running
+            )
+            self._unit_status_lower_priority_messages[workload_is_running] = message
+        if workload_is_running:
+            return ops.ActiveStatus(message)
+        return ops.WaitingStatus(message)
+
+    def _get_unit_status_lower_priority_message(self, *, workload_is_running: bool) -> str:
         workload_container_matches_pin = (
             self._installed_workload_container_version == self._pinned_workload_container_version
         )
@@ -691,12 +948,63 @@ class Kubernetes(Common):
             # Display at end of message instead of next to workload to avoid implying that the
             # workload is running
             message += " (restart pending)"
-        if workload_is_running:
-            return ops.ActiveStatus(message)
-        return ops.WaitingStatus(message)
+        return message
 
-    @staticmethod
-    def _get_partition() -> int:
+    @functools.cached_property
+    def _original_versions(self) -> _OriginalVersions:
+        """Original versions in app databag
+
+        Cached since app databag is only written by this unit (if leader) with
+        `self._save_original_versions()`, which also updates the cached value
+        """
+        return _OriginalVersions.from_app_databag(self._relation.my_app_ro)
+
+    def _save_original_versions(self, original_versions: _OriginalVersions, /):
+        """Save versions in app databag for next refresh & update `self._original_versions`
+
+        Only write path for original versions in app databag. Only call if this unit is leader
+        """
+        original_versions.write_to_app_databag(self._relation.my_app_rw)
+        self._original_versions = original_versions
+
+    @functools.cached_property
+    def _other_units_refresh_started_hashes(self) -> typing.FrozenSet[str]:
+        """Union of "refresh_started_if_app_controller_revision_hash_in" in other units' databags
+
+        Cached since other units' databags do not change during a Juju event
+        """
+        hashes = set()
+        for unit in self._units:
+            if unit == charm.unit:
+                continue
+            # During scale up or scale down, `unit` may be missing from relation
+            hashes.update(
+                self._relation.get(unit, {}).get(
+                    "refresh_started_if_app_controller_revision_hash_in", tuple()
+                )
+            )
+        return frozenset(hashes)
+
+    def _refresh_started_if_app_controller_revision_hash_in(self, revision: str, /) -> bool:
+        """Whether `revision` is in "refresh_started_if_app_controller_revision_hash_in"
+
+        Checks all units' databags & the app databag
+
+        This unit's databag & the app databag are not cached since this unit writes to them
+        """
+        return (
+            revision in self._other_units_refresh_started_hashes
+            or revision
+            in self._relation.my_unit.get(
+                "refresh_started_if_app_controller_revision_hash_in", tuple()
+            )
+            or revision
+            in self._relation.my_app_ro.get(
+                "refresh_started_if_app_controller_revision_hash_in", tuple()
+            )
+        )
+
+    def _get_partition(self) -> int:
         """Get Kubernetes StatefulSet rollingUpdate partition
 
         Specifies which units can refresh
@@ -714,13 +1022,14 @@ class Kubernetes(Common):
 
         https://kubernetes.io/docs/concepts/workloads/controllers/statefulset/#partitions
         """
-        stateful_set = lightkube.Client().get(lightkube.resources.apps_v1.StatefulSet, charm.app)
+        import lightkube.resources.apps_v1
+
+        stateful_set = self._client.get(lightkube.resources.apps_v1.StatefulSet, charm.app)
         partition = stateful_set.spec.updateStrategy.rollingUpdate.partition
         assert partition is not None
         return partition
 
-    @staticmethod
-    def _set_partition(value: int, /):
+    def _set_partition(self, value: int, /):
         """Set Kubernetes StatefulSet rollingUpdate partition
 
         Specifies which units can refresh
@@ -738,7 +1047,9 @@ class Kubernetes(Common):
 
         https://kubernetes.io/docs/concepts/workloads/controllers/statefulset/#partitions
         """
-        lightkube.Client().patch(
+        import lightkube.resources.apps_v1
+
+        self._client.patch(
             lightkube.resources.apps_v1.StatefulSet,
             charm.app,
             {"spec": {"updateStrategy": {"rollingUpdate": {"partition": value}}}},
@@ -774,46 +1085,9 @@ class Kubernetes(Common):
         `self._unit_status_higher_priority` (unit status is not cleared if
         `self._unit_status_higher_priority` is `None`—that is the responsibility of the charm)
         """
-
-        class _InvalidForceEvent(ValueError):
-            """Event is not valid force-refresh-start action event"""
-
-        class _ForceRefreshStartAction(charm.ActionEvent):
-            def __init__(
-                self, event: charm.Event, /, *, first_unit_to_refresh: charm.Unit, in_progress: bool
-            ):
-                if not isinstance(event, charm.ActionEvent):
-                    raise _InvalidForceEvent
-                super().__init__()
-                if event.action != "force-refresh-start":
-                    raise _InvalidForceEvent
-                if charm.unit != first_unit_to_refresh:
-                    event.fail(f"Must run action on unit {first_unit_to_refresh.number}")
-                    raise _InvalidForceEvent
-                if not in_progress:
-                    event.fail("No refresh in progress")
-                    raise _InvalidForceEvent
-                self.check_workload_container: bool = event.parameters["check-workload-container"]
-                self.check_compatibility: bool = event.parameters["check-compatibility"]
-                self.run_pre_refresh_checks: bool = event.parameters["run-pre-refresh-checks"]
-                for parameter in (
-                    self.check_workload_container,
-                    self.check_compatibility,
-                    self.run_pre_refresh_checks,
-                ):
-                    if parameter is False:
-                        break
-                else:
-                    event.fail(
-                        "Must run with at least one of `check-compatibility`, "
-                        "`run-pre-refresh-checks`, or `check-workload-container` parameters "
-                        "`=false`"
-                    )
-                    raise _InvalidForceEvent
-
-        force_start: typing.Optional[_ForceRefreshStartAction]
+        force_start: typing.Optional[_KubernetesForceRefreshStartAction]
         try:
-            force_start = _ForceRefreshStartAction(
+            force_start = _KubernetesForceRefreshStartAction(
                 charm.event, first_unit_to_refresh=self._units[0], in_progress=self._in_progress
             )
         except _InvalidForceEvent:
@@ -821,15 +1095,8 @@ class Kubernetes(Common):
         self._unit_status_higher_priority: typing.Optional[charm.Status] = None
         if not self._in_progress:
             return
-        self._refresh_started = any(
+        self._refresh_started = self._refresh_started_if_app_controller_revision_hash_in(
             self._app_controller_revision
-            # During scale up or scale down, `unit` may be missing from relation
-            in self._relation.get(unit, {}).get(
-                "refresh_started_if_app_controller_revision_hash_in", tuple()
-            )
-            for unit in self._units
-        ) or self._app_controller_revision in self._relation.my_app_ro.get(
-            "refresh_started_if_app_controller_revision_hash_in", tuple()
         )
         """Whether this app has started to refresh to `self._app_controller_revision`
 
@@ -860,7 +1127,7 @@ class Kubernetes(Common):
         # `len(self._units) == 1`, `self._in_progress` should be `False`
         assert len(self._units) > 1
 
-        original_versions = _OriginalVersions.from_app_databag(self._relation.my_app_ro)
+        original_versions = self._original_versions
         if not self._refresh_started:
             # Check if this unit is rolling back
             if (
@@ -883,13 +1150,9 @@ class Kubernetes(Common):
                         f"{self._charm_specific.workload_name} container "
                         f"{repr(self._installed_workload_container_version)}"
                     )
-                if self._installed_charm_revision_raw.charmhub_revision:
-                    charm_version = (
-                        f"revision {self._installed_charm_revision_raw.charmhub_revision} "
-                        f"({repr(self._installed_charm_version)})"
-                    )
-                else:
-                    charm_version = f"{repr(self._installed_charm_version)}"
+                charm_version = _charm_version_for_log(
+                    self._installed_charm_version, self._installed_charm_revision_raw
+                )
                 logger.info(
                     "Rollback detected. Automatic refresh checks skipped. Refresh started for "
                     f"StatefulSet controller revision {self._unit_controller_revision}. Rolling "
@@ -911,38 +1174,31 @@ class Kubernetes(Common):
         # Run automatic checks
 
         # Log workload & charm versions we're refreshing from & to
-        from_to_message = f"from {self._charm_specific.workload_name} "
         if original_versions.installed_workload_container_matched_pinned_container:
-            from_to_message += (
+            from_workload_version = (
                 f"{original_versions.workload} (container "
-                f"{repr(original_versions.workload_container)}) "
+                f"{repr(original_versions.workload_container)})"
             )
         else:
-            from_to_message += f"container {repr(original_versions.workload_container)} "
-        from_to_message += "and charm "
-        if original_versions.charm_revision_raw.charmhub_revision:
-            from_to_message += (
-                f"revision {original_versions.charm_revision_raw.charmhub_revision} "
-                f"({repr(original_versions.charm)}) "
-            )
-        else:
-            from_to_message += f"{repr(original_versions.charm)} "
-        from_to_message += f"to {self._charm_specific.workload_name} "
+            from_workload_version = f"container {repr(original_versions.workload_container)}"
         if self._installed_workload_container_version == self._pinned_workload_container_version:
-            from_to_message += (
+            to_workload_version = (
                 f"{self._pinned_workload_version} (container "
-                f"{repr(self._installed_workload_container_version)}) "
+                f"{repr(self._installed_workload_container_version)})"
             )
         else:
-            from_to_message += f"container {repr(self._installed_workload_container_version)} "
-        from_to_message += "and charm "
-        if self._installed_charm_revision_raw.charmhub_revision:
-            from_to_message += (
-                f"revision {self._installed_charm_revision_raw.charmhub_revision} "
-                f"({repr(self._installed_charm_version)})"
-            )
-        else:
-            from_to_message += f"{repr(self._installed_charm_version)}"
+            to_workload_version = f"container {repr(self._installed_workload_container_version)}"
+        from_charm_version = _charm_version_for_log(
+            original_versions.charm, original_versions.charm_revision_raw
+        )
+        to_charm_version = _charm_version_for_log(
+            self._installed_charm_version, self._installed_charm_revision_raw
+        )
+        from_to_message = (
+            f"from {self._charm_specific.workload_name} {from_workload_version} and charm "
+            f"{from_charm_version} to {self._charm_specific.workload_name} {to_workload_version} "
+            f"and charm {to_charm_version}"
+        )
         if force_start:
             false_values = []
             if not force_start.check_workload_container:
@@ -1153,15 +1409,6 @@ class Kubernetes(Common):
         # called twice in one Juju event
 
         self._app_status_higher_priority: typing.Optional[charm.Status] = None
-
-        class _ResumeRefreshAction(charm.ActionEvent):
-            def __init__(self, event: charm.ActionEvent, /):
-                super().__init__()
-                assert event.action == "resume-refresh"
-                self.check_health_of_refreshed_units: bool = event.parameters[
-                    "check-health-of-refreshed-units"
-                ]
-
         action: typing.Optional[_ResumeRefreshAction] = None
         if isinstance(charm.event, charm.ActionEvent) and charm.event.action == "resume-refresh":
             action = _ResumeRefreshAction(charm.event)
@@ -1312,8 +1559,9 @@ class Kubernetes(Common):
             self._set_partition(target_partition)
             partition = target_partition
             message = f"Set StatefulSet partition to {target_partition} because {reason}"
+            pod_uids_not_tearing_down = {unit.pod_uid for unit in self._units_not_tearing_down}
             if units_tearing_down := [
-                unit for unit in self._units if unit not in self._units_not_tearing_down
+                unit for unit in self._units if unit.pod_uid not in pod_uids_not_tearing_down
             ]:
                 message += (
                     ". Computed by excluding units that are tearing down: "
@@ -1352,6 +1600,11 @@ class Kubernetes(Common):
                 f"expected type 'CharmSpecificKubernetes', got {repr(type(charm_specific).__name__)}"
             )
         self._charm_specific = charm_specific
+        # Caches for `self.workload_allowed_to_start` and `self.unit_status_lower_priority()`
+        # Values are final after `self._start_refresh()`
+        self._workload_allowed_to_start: typing.Optional[bool] = None
+        self._unit_status_lower_priority_messages: typing.Dict[bool, str] = {}
+        """Keyed by `workload_is_running`"""
 
         _LOCAL_STATE.mkdir(exist_ok=True)
         # Save state if this unit is tearing down.
@@ -1364,10 +1617,22 @@ class Kubernetes(Common):
             # This unit is tearing down
             tearing_down.touch()
 
+        import lightkube
+        import lightkube.models.authorization_v1
+        import lightkube.resources.apps_v1
+        import lightkube.resources.authorization_v1
+        import lightkube.resources.core_v1
+
+        self._client = lightkube.Client()
+        """Kubernetes API client shared by all requests in this Juju event
+
+        Avoids re-loading the client configuration and opening a new (TLS) connection for each
+        request
+        """
+
         # Check if Juju app was deployed with `--trust` (needed to patch StatefulSet partition)
         if not (
-            lightkube.Client()
-            .create(
+            self._client.create(
                 lightkube.resources.authorization_v1.SelfSubjectAccessReview(
                     spec=lightkube.models.authorization_v1.SelfSubjectAccessReviewSpec(
                         resourceAttributes=lightkube.models.authorization_v1.ResourceAttributes(
@@ -1378,8 +1643,7 @@ class Kubernetes(Common):
                         )
                     )
                 )
-            )
-            .status.allowed
+            ).status.allowed
         ):
             logger.warning(
                 f"Run `juju trust {charm.app} --scope=cluster`. Needed for in-place refreshes"
@@ -1394,28 +1658,38 @@ class Kubernetes(Common):
         # Each `juju refresh` updates the app's StatefulSet which creates a new controller revision
         # https://kubernetes.io/docs/reference/kubernetes-api/workload-resources/controller-revision-v1/
         # Controller revisions are used by Kubernetes for StatefulSet rolling updates
-        self._app_controller_revision: str = (
-            lightkube.Client()
-            .get(lightkube.resources.apps_v1.StatefulSet, charm.app)
-            .status.updateRevision
-        )
-        """This app's controller revision"""
+        # List pods in another thread while getting the StatefulSet so that the two Kubernetes API
+        # requests are not made serially
+        import concurrent.futures
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            # Pass the client (created before any thread is started) to the worker thread
+            pods_future = executor.submit(
+                lambda client: list(
+                    client.list(
+                        lightkube.resources.core_v1.Pod,
+                        labels={"app.kubernetes.io/name": charm.app},
+                    )
+                ),
+                self._client,
+            )
+            self._app_controller_revision: str = self._client.get(
+                lightkube.resources.apps_v1.StatefulSet, charm.app
+            ).status.updateRevision
+            """This app's controller revision"""
+            pods = pods_future.result()
         assert self._app_controller_revision is not None
-        pods = lightkube.Client().list(
-            lightkube.resources.core_v1.Pod, labels={"app.kubernetes.io/name": charm.app}
-        )
         unsorted_units = []
         for pod in pods:
             unit = _KubernetesUnit.from_pod(pod)
             unsorted_units.append(unit)
             if unit == charm.unit:
+                this_unit = unit
                 this_pod = pod
         assert this_pod
         self._units = sorted(unsorted_units, reverse=True)
         """Sorted from highest to lowest unit number (refresh order)"""
-        self._unit_controller_revision = next(
-            unit for unit in self._units if unit == charm.unit
-        ).controller_revision
+        self._unit_controller_revision = this_unit.controller_revision
         """This unit's controller revision"""
 
         # Check if this unit is tearing down
@@ -1429,10 +1703,7 @@ class Kubernetes(Common):
 
             tearing_down_logged = _LOCAL_STATE / "kubernetes_unit_tearing_down_logged"
             if not tearing_down_logged.exists():
-                logger.info(
-                    "Unit tearing down (pod uid "
-                    f"{next(unit for unit in self._units if unit == charm.unit).pod_uid})"
-                )
+                logger.info(f"Unit tearing down (pod uid {this_unit.pod_uid})")
                 tearing_down_logged.touch()
 
             raise UnitTearingDown
@@ -1517,7 +1788,7 @@ class Kubernetes(Common):
 
                 # Trigger Juju event on leader unit to lower partition if needed
                 self._relation.my_unit["_unused_pod_uid_after_pod_restart_and_partition_raised"] = (
-                    next(unit for unit in self._units if unit == charm.unit).pod_uid
+                    this_unit.pod_uid
                 )
         had_opportunity_to_raise_partition_after_pod_restart.touch()
 
@@ -1537,14 +1808,23 @@ class Kubernetes(Common):
         # Used to persist data to databag in case an uncaught exception was raised (or the charm
         # code was terminated) in the Juju event where the data was originally set
         if self._pod_uids_of_units_that_are_tearing_down_local_state.exists():
-            tearing_down_uids1: typing.MutableSequence[str] = self._relation.my_unit.setdefault(
+            tearing_down_uids1: typing.Sequence[str] = self._relation.my_unit.get(
                 "pod_uids_of_units_that_are_tearing_down", tuple()
             )
-            for uid in json.loads(
-                self._pod_uids_of_units_that_are_tearing_down_local_state.read_text()
-            ):
-                if uid not in tearing_down_uids1:
-                    tearing_down_uids1.append(uid)
+            # Dictionary keys preserve insertion order
+            merged_uids = dict.fromkeys(tearing_down_uids1)
+            merged_uids.update(
+                dict.fromkeys(
+                    json.loads(
+                        _read_small_file(self._pod_uids_of_units_that_are_tearing_down_local_state)
+                    )
+                )
+            )
+            if list(merged_uids) != list(tearing_down_uids1):
+                # Write once (one `relation-set` call) instead of once per appended uid
+                self._relation.my_unit["pod_uids_of_units_that_are_tearing_down"] = list(
+                    merged_uids
+                )
 
         # Save state in databag if this unit sees another unit tearing down.
         # Used by the leader unit to set the StatefulSet partition so that the partition does not
@@ -1571,7 +1851,7 @@ class Kubernetes(Common):
                 # Juju will terminate the charm code process for this event and any changes to
                 # databags will not be saved.
                 self._pod_uids_of_units_that_are_tearing_down_local_state.write_text(
-                    json.dumps(list(tearing_down_uids2), indent=4)
+                    _LOCAL_STATE_JSON_ENCODER.encode(list(tearing_down_uids2))
                 )
 
         tearing_down_uids3 = set()
@@ -1602,17 +1882,26 @@ class Kubernetes(Common):
         # compatibility checks, and pre-refresh checks from running again on scale down).
         # Whether this unit is leader
         if self._relation.my_app_rw is not None:
-            hashes2: typing.MutableSequence[str] = self._relation.my_app_rw.setdefault(
+            hashes2: typing.Sequence[str] = self._relation.my_app_rw.get(
                 "refresh_started_if_app_controller_revision_hash_in", tuple()
             )
+            # Dictionary keys preserve insertion order
+            merged_hashes = dict.fromkeys(hashes2)
             for unit in self._units:
-                # During scale up, scale down, or initial install, `unit` may be missing from
-                # relation
-                for hash_ in self._relation.get(unit, {}).get(
-                    "refresh_started_if_app_controller_revision_hash_in", tuple()
-                ):
-                    if hash_ not in hashes2:
-                        hashes2.append(hash_)
+                merged_hashes.update(
+                    dict.fromkeys(
+                        # During scale up, scale down, or initial install, `unit` may be missing
+                        # from relation
+                        self._relation.get(unit, {}).get(
+                            "refresh_started_if_app_controller_revision_hash_in", tuple()
+                        )
+                    )
+                )
+            if list(merged_hashes) != list(hashes2):
+                # Write once (one `relation-set` call) instead of once per appended hash
+                self._relation.my_app_rw["refresh_started_if_app_controller_revision_hash_in"] = (
+                    list(merged_hashes)
+                )
 
         # Get installed charm revision
         self._installed_charm_revision_raw = _RawCharmRevision.from_file()
@@ -1629,7 +1918,7 @@ class Kubernetes(Common):
         """
 
         # Get installed & pinned workload container digest
-        metadata_yaml = yaml.safe_load(pathlib.Path("metadata.yaml").read_text())
+        metadata_yaml = _load_metadata_yaml()
         upstream_source = (
             metadata_yaml.get("resources", {})
             .get(self._charm_specific.oci_resource_name, {})
@@ -1640,22 +1929,18 @@ class Kubernetes(Common):
                 f"Unable to find `upstream-source` for {self._charm_specific.oci_resource_name=} "
                 "resource in metadata.yaml `resources`"
             )
-        try:
-            _, digest = upstream_source.split("@")
-            if not digest.startswith("sha256:"):
-                raise ValueError
-        except ValueError:
+        _, separator, digest = upstream_source.partition("@")
+        if not separator or "@" in digest or not digest.startswith("sha256:"):
             raise ValueError(
                 f"OCI image in `upstream-source` must be pinned to a digest (e.g. ends with "
                 "'@sha256:e53eb99abd799526bb5a5e6c58180ee47e2790c95d433a1352836aa27d0914a4'): "
                 f"{repr(upstream_source)}"
             )
-        else:
-            self._pinned_workload_container_version = digest
-            """Workload image digest pinned by this unit's charm code
+        self._pinned_workload_container_version = digest
+        """Workload image digest pinned by this unit's charm code
 
-            (e.g. "sha256:e53eb99abd799526bb5a5e6c58180ee47e2790c95d433a1352836aa27d0914a4")
-            """
+        (e.g. "sha256:e53eb99abd799526bb5a5e6c58180ee47e2790c95d433a1352836aa27d0914a4")
+        """
         workload_containers: typing.List[str] = [
             key
             for key, value in metadata_yaml.get("containers", {}).items()
@@ -1675,39 +1960,34 @@ class Kubernetes(Common):
         else:
             workload_container = workload_containers[0]
 
-        class _InstalledWorkloadContainerDigestNotAvailable(Exception):
-            """This unit's workload container digest is not available from the Kubernetes API
-
-            If a refresh is not in progress, this is likely a temporary issue that will be resolved
-            in a few seconds (probably in the next 1-2 Juju events).
-
-            If a refresh is in progress, it's possible that the user refreshed to a workload
-            container digest that doesn't exist. In that case, this issue will not be resolved
-            unless the user runs `juju refresh` again.
-            """
-
-        try:
-            workload_container_statuses = [
-                status
-                for status in this_pod.status.containerStatuses
-                if status.name == workload_container
-            ]
-            if len(workload_container_statuses) == 0:
-                raise _InstalledWorkloadContainerDigestNotAvailable
-            if len(workload_container_statuses) > 1:
+        workload_container_statuses = [
+            status
+            for status in this_pod.status.containerStatuses
+            if status.name == workload_container
+        ]
+        if len(workload_container_statuses) > 1:
+            raise ValueError(
+                f"Found multiple {workload_container} containers for this unit's pod. "
+                "Expected 1 container"
+            )
+        # Example: "registry.jujucharms.com/charm/kotcfrohea62xreenq1q75n1lyspke0qkurhk/postgresql-image@sha256:e53eb99abd799526bb5a5e6c58180ee47e2790c95d433a1352836aa27d0914a4"
+        image_id = workload_container_statuses[0].imageID if workload_container_statuses else None
+        if image_id:
+            image_name, separator, image_digest = image_id.partition("@")
+            if not separator or "@" in image_digest:
                 raise ValueError(
-                    f"Found multiple {workload_container} containers for this unit's pod. "
-                    "Expected 1 container"
+                    f"Unexpected {workload_container} container image ID for this unit's pod. "
+                    f"Expected '<image name>@<digest>': {repr(image_id)}"
                 )
-            # Example: "registry.jujucharms.com/charm/kotcfrohea62xreenq1q75n1lyspke0qkurhk/postgresql-image@sha256:e53eb99abd799526bb5a5e6c58180ee47e2790c95d433a1352836aa27d0914a4"
-            image_id = workload_container_statuses[0].imageID
-            if not image_id:
-                raise _InstalledWorkloadContainerDigestNotAvailable
-            image_name, image_digest = image_id.split("@")
-        except _InstalledWorkloadContainerDigestNotAvailable:
+        else:
+            # This unit's workload container digest is not available from the Kubernetes API
+            # If a refresh is not in progress, this is likely a temporary issue that will be
+            # resolved in a few seconds (probably in the next 1-2 Juju events).
+            # If a refresh is in progress, it's possible that the user refreshed to a workload
+            # container digest that doesn't exist. In that case, this issue will not be resolved
+            # unless the user runs `juju refresh` again.
             # Fall back to image pinned in metadata.yaml
-            image_name, _ = upstream_source.split("@")
-
+            image_name, _, _ = upstream_source.partition("@")
             image_digest = None
         self._installed_workload_image_name: str = image_name
         """This unit's workload image name
@@ -1748,22 +2028,22 @@ class Kubernetes(Common):
         # the same controller revision as the first unit to refresh are not accessible. Therefore,
         # include units with the same controller revision as the first unit to refresh that's not
         # tearing down—to ensure that `len(pause_after_values) >= 1`.
-        most_up_to_date_units = (
-            unit
-            for unit in self._units
-            if unit.controller_revision == self._units[0].controller_revision
-            or unit.controller_revision == self._units_not_tearing_down[0].controller_revision
+        most_up_to_date_controller_revisions = (
+            self._units[0].controller_revision,
+            self._units_not_tearing_down[0].controller_revision,
         )
-        pause_after_values = (
+        pause_after_values = []
+        for unit in self._units:
+            if unit.controller_revision not in most_up_to_date_controller_revisions:
+                continue
             # During scale up or initial install, `unit` or "pause_after_unit_refresh_config" key
             # may be missing from relation. During scale down, `unit` may be missing from relation.
-            self._relation.get(unit, {}).get("pause_after_unit_refresh_config")
-            for unit in most_up_to_date_units
-        )
-        # Exclude `None` values (for scale up/down or initial install) to avoid displaying app
-        # status that says pause-after-unit-refresh is set to invalid value
-        pause_after_values = (value for value in pause_after_values if value is not None)
-        self._pause_after = max(_PauseAfter(value) for value in pause_after_values)
+            value = self._relation.get(unit, {}).get("pause_after_unit_refresh_config")
+            # Exclude `None` values (for scale up/down or initial install) to avoid displaying app
+            # status that says pause-after-unit-refresh is set to invalid value
+            if value is not None:
+                pause_after_values.append(_PauseAfter(value))
+        self._pause_after = max(pause_after_values)
 
         if not self._in_progress:
             # Clean up state that is no longer in use
@@ -1785,13 +2065,14 @@ class Kubernetes(Common):
                         self._installed_workload_container_version
                         == self._pinned_workload_container_version
                     )
-                    _OriginalVersions(
+                    original_versions = _OriginalVersions(
                         workload=self._pinned_workload_version if matches_pin else None,
                         workload_container=self._installed_workload_container_version,
                         installed_workload_container_matched_pinned_container=matches_pin,
                         charm=self._installed_charm_version,
                         charm_revision_raw=self._installed_charm_revision_raw,
-                    ).write_to_app_databag(self._relation.my_app_rw)
+                    )
+                    self._save_original_versions(original_versions)
                 else:
                     logger.info(
                         "This unit's workload container digest is not available from the "
@@ -1800,7 +2081,7 @@ class Kubernetes(Common):
                     )
 
         if self._in_progress or (charm.is_leader and self._installed_workload_container_version):
-            original_versions = _OriginalVersions.from_app_databag(self._relation.my_app_ro)
+            original_versions = self._original_versions
             self._rollback_command = (
                 f"juju refresh {charm.app} --revision "
                 f"{original_versions.charm_revision_raw.charmhub_revision} --resource "
@@ -1874,6 +2155,9 @@ class Kubernetes(Common):
                 )
 
         self._start_refresh()
+        # Values cached before `self._start_refresh()` may be outdated
+        self._workload_allowed_to_start = None
+        self._unit_status_lower_priority_messages.clear()
 
         self._set_partition_and_app_status(handle_action=True)
 
@@ -1889,6 +2173,9 @@ class _HistoryEntry:
     is not up-to-date. That refresh should not be stored as a `_HistoryEntry`
     """
 
+    # `dataclasses.dataclass(slots=True)` requires python 3.10
+    __slots__ = ("charm_revision", "time_of_refresh")
+
     charm_revision: _RawCharmRevision
     """Charm revision in .juju-charm file (e.g. "ch:amd64/jammy/postgresql-k8s-602")"""
     time_of_refresh: float
@@ -1908,28 +2195,29 @@ class _CharmCodeRefreshHistory:
     _PATH = _LOCAL_STATE / "machines_last_two_refreshes_to_up_to_date_charm_code_version.json"
 
     @classmethod
-    def from_file(cls, *, installed_charm_version: CharmVersion):
+    def from_file(
+        cls,
+        *,
+        installed_charm_version: CharmVersion,
+        installed_charm_revision: _RawCharmRevision,
+    ):
         try:
             data: typing.Dict[str, typing.Optional[dict]] = json.loads(cls._PATH.read_text())
         except FileNotFoundError:
             # This is initial installation or this is a new unit that was added during scale up
 
-            charm_revision = _RawCharmRevision.from_file()
             history = cls(
                 last_refresh_to_up_to_date_charm_code_version=_HistoryEntry(
-                    charm_revision=charm_revision,
+                    charm_revision=installed_charm_revision,
                     time_of_refresh=_dot_juju_charm_modified_time(),
                 ),
                 second_to_last_refresh_to_up_to_date_charm_code_version=None,
             )
             history.save_to_file()
 
-            if charm_revision.charmhub_revision:
-                charm_version = (
-                    f"revision {charm_revision.charmhub_revision} ({repr(installed_charm_version)})"
-                )
-            else:
-                charm_version = f"{(repr(installed_charm_version))}"
+            charm_version = _charm_version_for_log(
+                installed_charm_version, installed_charm_revision
+            )
             logger.info(f"Charm {charm_version} installed at {_dot_juju_charm_modified_time()}")
 
             return history
@@ -1941,7 +2229,7 @@ class _CharmCodeRefreshHistory:
         return cls(**data2)
 
     def save_to_file(self):
-        self._PATH.write_text(json.dumps(dataclasses.asdict(self), indent=4))
+        self._PATH.write_text(_LOCAL_STATE_JSON_ENCODER.encode(dataclasses.asdict(self)))
 
 
 class _MachinesInProgress(enum.Enum):
@@ -1975,6 +2263,51 @@ class _MachinesDatabagUpToDate(enum.Enum):
         raise TypeError
 
 
+class _MachinesForceRefreshStartAction(charm.ActionEvent):
+    def __init__(
+        self,
+        event: charm.Event,
+        /,
+        *,
+        first_unit_to_refresh: charm.Unit,
+        in_progress: _MachinesInProgress,
+    ):
+        if not isinstance(event, charm.ActionEvent):
+            raise _InvalidForceEvent
+        super().__init__()
+        if event.action != "force-refresh-start":
+            raise _InvalidForceEvent
+        if charm.unit != first_unit_to_refresh:
+            event.fail(f"Must run action on unit {first_unit_to_refresh.number}")
+            raise _InvalidForceEvent
+        if in_progress is not _MachinesInProgress.TRUE:
+            if in_progress is _MachinesInProgress.FALSE:
+                message = "No refresh in progress"
+            elif in_progress is _MachinesInProgress.UNKNOWN:
+                message = (
+                    "Determining if a refresh is in progress. Check `juju status` and "
+                    "consider retrying this action"
+                )
+            else:
+                raise TypeError
+            event.fail(message)
+            raise _InvalidForceEvent
+        self.check_workload_container: bool = event.parameters["check-workload-container"]
+        self.check_compatibility: bool = event.parameters["check-compatibility"]
+        self.run_pre_refresh_checks: bool = event.parameters["run-pre-refresh-checks"]
+        if (
+            self.check_workload_container
+            and self.check_compatibility
+            and self.run_pre_refresh_checks
+        ):
+            event.fail(
+                "Must run with at least one of `check-compatibility`, "
+                "`run-pre-refresh-checks`, or `check-workload-container` parameters "
+                "`=false`"
+            )
+            raise _InvalidForceEvent
+
+
 class Machines(Common):
     """In-place rolling refreshes of stateful charmed applications on machines
 
@@ -2094,7 +2427,7 @@ class Machines(Common):
             )
         message = f"{self._charm_specific.workload_name}"
         if self._installed_workload_version.exists():
-            message += f" {self._installed_workload_version.read_text()}"
+            message += f" {_read_small_file(self._installed_workload_version)}"
         if workload_is_running:
             message += " running"
         message += f"; Snap revision {self._get_installed_snap_revision()}"
@@ -2110,9 +2443,28 @@ class Machines(Common):
             return ops.ActiveStatus(message)
         return ops.WaitingStatus(message)
 
+    @functools.cached_property
+    def _original_versions(self) -> _OriginalVersions:
+        """Original versions in app databag
+
+        Cached since app databag is only written by this unit (if leader) with
+        `self._save_original_versions()`, which also updates the cached value
+        """
+        return _OriginalVersions.from_app_databag(self._relation.my_app_ro)
+
+    def _save_original_versions(self, original_versions: _OriginalVersions, /):
+        """Save versions in app databag for next refresh & update `self._original_versions`
+
+        Only write path for original versions in app databag. Only call if this unit is leader
+        """
+        original_versions.write_to_app_databag(self._relation.my_app_rw)
+        self._original_versions = original_versions
+
     def _get_installed_snap_revision(self) -> typing.Optional[str]:
         # TODO docs: snap name cannot change on refresh
         # https://snapcraft.io/docs/using-the-api
+        import httpx
+
         client = httpx.Client(transport=httpx.HTTPTransport(uds="/run/snapd.socket"))
         # https://snapcraft.io/docs/snapd-rest-api#heading--snaps
         response = client.get(
@@ -2309,62 +2661,11 @@ class Machines(Common):
         `self._unit_status_higher_priority` (unit status is not cleared if
         `self._unit_status_higher_priority` is `None`—that is the responsibility of the charm)
         """
-
-        class _InvalidForceEvent(ValueError):
-            """Event is not valid force-refresh-start action event"""
-
-        class _ForceRefreshStartAction(charm.ActionEvent):
-            def __init__(
-                self,
-                event: charm.Event,
-                /,
-                *,
-                first_unit_to_refresh: charm.Unit,
-                in_progress: _MachinesInProgress,
-            ):
-                if not isinstance(event, charm.ActionEvent):
-                    raise _InvalidForceEvent
-                super().__init__()
-                if event.action != "force-refresh-start":
-                    raise _InvalidForceEvent
-                if charm.unit != first_unit_to_refresh:
-                    event.fail(f"Must run action on unit {first_unit_to_refresh.number}")
-                    raise _InvalidForceEvent
-                if in_progress is not _MachinesInProgress.TRUE:
-                    if in_progress is _MachinesInProgress.FALSE:
-                        message = "No refresh in progress"
-                    elif in_progress is _MachinesInProgress.UNKNOWN:
-                        message = (
-                            "Determining if a refresh is in progress. Check `juju status` and "
-                            "consider retrying this action"
-                        )
-                    else:
-                        raise TypeError
-                    event.fail(message)
-                    raise _InvalidForceEvent
-                self.check_workload_container: bool = event.parameters["check-workload-container"]
-                self.check_compatibility: bool = event.parameters["check-compatibility"]
-                self.run_pre_refresh_checks: bool = event.parameters["run-pre-refresh-checks"]
-                for parameter in (
-                    self.check_workload_container,
-                    self.check_compatibility,
-                    self.run_pre_refresh_checks,
-                ):
-                    if parameter is False:
-                        break
-                else:
-                    event.fail(
-                        "Must run with at least one of `check-compatibility`, "
-                        "`run-pre-refresh-checks`, or `check-workload-container` parameters "
-                        "`=false`"
-                    )
-                    raise _InvalidForceEvent
-
-        self._force_start: typing.Optional[_ForceRefreshStartAction] = None
+        self._force_start: typing.Optional[_MachinesForceRefreshStartAction] = None
         """Used to log snap refresh to action output if snap refresh caused by force-refresh-start action"""
-        force_start: typing.Optional[_ForceRefreshStartAction]
+        force_start: typing.Optional[_MachinesForceRefreshStartAction]
         try:
-            force_start = _ForceRefreshStartAction(
+            force_start = _MachinesForceRefreshStartAction(
                 charm.event, first_unit_to_refresh=self._units[0], in_progress=self._in_progress
             )
         except _InvalidForceEvent:
@@ -2386,7 +2687,7 @@ class Machines(Common):
                 )
             return
 
-        original_versions = _OriginalVersions.from_app_databag(self._relation.my_app_ro)
+        original_versions = self._original_versions
         if not self._refresh_started:
             # Check if this unit is rolling back
             if original_versions.charm == self._installed_charm_version:
@@ -2404,13 +2705,9 @@ class Machines(Common):
                     f"{self._charm_specific.workload_name} {self._pinned_workload_version} (snap "
                     f"revision {self._pinned_workload_container_version})"
                 )
-                if self._installed_charm_revision_raw.charmhub_revision:
-                    charm_version = (
-                        f"revision {self._installed_charm_revision_raw.charmhub_revision} "
-                        f"({repr(self._installed_charm_version)})"
-                    )
-                else:
-                    charm_version = f"{repr(self._installed_charm_version)}"
+                charm_version = _charm_version_for_log(
+                    self._installed_charm_version, self._installed_charm_revision_raw
+                )
                 logger.info(
                     "Rollback detected. Automatic refresh checks skipped. Refresh started. "
                     f"Rolling back to {workload_version} and charm {charm_version}"
@@ -2427,28 +2724,18 @@ class Machines(Common):
         # Run automatic checks
 
         # Log workload & charm versions we're refreshing from & to
+        from_charm_version = _charm_version_for_log(
+            original_versions.charm, original_versions.charm_revision_raw
+        )
+        to_charm_version = _charm_version_for_log(
+            self._installed_charm_version, self._installed_charm_revision_raw
+        )
         from_to_message = (
             f"from {self._charm_specific.workload_name} {original_versions.workload} (snap "
-            f"revision {original_versions.workload_container}) and charm "
-        )
-        if original_versions.charm_revision_raw.charmhub_revision:
-            from_to_message += (
-                f"revision {original_versions.charm_revision_raw.charmhub_revision} "
-                f"({repr(original_versions.charm)}) "
-            )
-        else:
-            from_to_message += f"{repr(original_versions.charm)} "
-        from_to_message += (
+            f"revision {original_versions.workload_container}) and charm {from_charm_version} "
             f"to {self._charm_specific.workload_name} {self._pinned_workload_version} (snap "
-            f"revision {self._pinned_workload_container_version}) and charm "
+            f"revision {self._pinned_workload_container_version}) and charm {to_charm_version}"
         )
-        if self._installed_charm_revision_raw.charmhub_revision:
-            from_to_message += (
-                f"revision {self._installed_charm_revision_raw.charmhub_revision} "
-                f"({repr(self._installed_charm_version)})"
-            )
-        else:
-            from_to_message += f"{repr(self._installed_charm_version)}"
         if force_start:
             false_values = []
             if not force_start.check_workload_container:
@@ -2584,7 +2871,7 @@ class Machines(Common):
             charm.app_status = self._app_status_higher_priority
             return
         assert self._in_progress is _MachinesInProgress.TRUE
-        original_versions = _OriginalVersions.from_app_databag(self._relation.my_app_ro)
+        original_versions = self._original_versions
         if not self._refresh_started and not self._charm_specific.is_compatible(
             old_charm_version=original_versions.charm,
             new_charm_version=self._installed_charm_version,
@@ -2663,15 +2950,6 @@ class Machines(Common):
 
         Handles resume-refresh action
         """
-
-        class _ResumeRefreshAction(charm.ActionEvent):
-            def __init__(self, event: charm.ActionEvent, /):
-                super().__init__()
-                assert event.action == "resume-refresh"
-                self.check_health_of_refreshed_units: bool = event.parameters[
-                    "check-health-of-refreshed-units"
-                ]
-
         action: typing.Optional[_ResumeRefreshAction] = None
         if isinstance(charm.event, charm.ActionEvent) and charm.event.action == "resume-refresh":
             action = _ResumeRefreshAction(charm.event)
@@ -2692,7 +2970,7 @@ class Machines(Common):
         installed_snap_revision = self._get_installed_snap_revision()
         if self._installed_workload_version.exists():
             from_version = (
-                f"{self._installed_workload_version.read_text()} (snap revision "
+                f"{_read_small_file(self._installed_workload_version)} (snap revision "
                 f"{installed_snap_revision})"
             )
         else:
@@ -2978,7 +3256,8 @@ class Machines(Common):
         #    To mitigate this issue, we only store the timestamp on refresh if we know that the
         #    refresh was to the up-to-date charm code version.
         self._history = _CharmCodeRefreshHistory.from_file(
-            installed_charm_version=self._installed_charm_version
+            installed_charm_version=self._installed_charm_version,
+            installed_charm_revision=self._installed_charm_revision_raw,
         )
         self._refresh_started_local_state = _LOCAL_STATE / "machines_refresh_started"
         """NOTE: `self._refresh_started` and `self._refresh_started_local_state.exists()` can be
@@ -2991,13 +3270,9 @@ class Machines(Common):
         ):
             # Charm code has been refreshed
 
-            if self._installed_charm_revision_raw.charmhub_revision:
-                charm_version = (
-                    f"revision {self._installed_charm_revision_raw.charmhub_revision} "
-                    f"({repr(self._installed_charm_version)})"
-                )
-            else:
-                charm_version = f"{repr(self._installed_charm_version)}"
+            charm_version = _charm_version_for_log(
+                self._installed_charm_version, self._installed_charm_revision_raw
+            )
             self._refresh_started_local_state.unlink(missing_ok=True)
             # If Juju emits an upgrade-charm event, the charm code version is up-to-date
             # If Juju emits a config-changed event, because of this Juju bug
@@ -3116,18 +3391,15 @@ class Machines(Common):
                 if up_to_date is _MachinesDatabagUpToDate.TRUE:
                     # Other unit's databag is up-to-date
 
+                    charm_version = _charm_version_for_log(
+                        self._installed_charm_version, self._installed_charm_revision_raw
+                    )
                     message = (
                         f"Learned from unit {unit.number} that refresh has started to "
                         f"{self._charm_specific.workload_name} {self._pinned_workload_version} "
                         f"(snap revision {self._pinned_workload_container_version}) and charm "
+                        f"{charm_version}"
                     )
-                    if self._installed_charm_revision_raw.charmhub_revision:
-                        message += (
-                            f"revision {self._installed_charm_revision_raw.charmhub_revision} "
-                            f"({repr(self._installed_charm_version)})"
-                        )
-                    else:
-                        message += f"{repr(self._installed_charm_version)}"
                     logger.info(message)
 
                     self._refresh_started = True
@@ -3180,18 +3452,15 @@ class Machines(Common):
                     # state & databag, `self._refresh_started` and
                     # `self._refresh_started_local_state.exists()` will be out of sync
 
+                    charm_version = _charm_version_for_log(
+                        self._installed_charm_version, self._installed_charm_revision_raw
+                    )
                     message = (
                         f"Presumed from unit {unit.number} that refresh has started to "
                         f"{self._charm_specific.workload_name} {self._pinned_workload_version} "
                         f"(snap revision {self._pinned_workload_container_version}) and charm "
+                        f"{charm_version}"
                     )
-                    if self._installed_charm_revision_raw.charmhub_revision:
-                        message += (
-                            f"revision {self._installed_charm_revision_raw.charmhub_revision} "
-                            f"({repr(self._installed_charm_version)})"
-                        )
-                    else:
-                        message += f"{repr(self._installed_charm_version)}"
                     # Save message to log it later if `self._in_progress` is not
                     # `_MachinesInProgress.FALSE`
                     # (To avoid logging the message on every Juju event if a refresh is not in
@@ -3450,10 +3719,11 @@ class Machines(Common):
             # Whether this unit is leader
             if self._relation.my_app_rw is not None:
                 # Save versions in app databag for next refresh
-                _OriginalVersions(
+                original_versions = _OriginalVersions(
                     workload=self._pinned_workload_version,
                     workload_container=self._pinned_workload_container_version,
                     installed_workload_container_matched_pinned_container=True,
                     charm=self._installed_charm_version,
                     charm_revision_raw=self._installed_charm_revision_raw,
-                ).write_to_app_databag(self._relation.my_app_rw)
+                )
+                self._save_original_versions(original_versions)